@@ -66,6 +66,15 @@ class HealthcareAPIClient {
             }
 
             const data = await response.json();
+
+            // 202 Accepted: result not ready yet, poll the returned URL after Retry-After
+            if (response.status === 202 && data.poll) {
+                const retryAfter = parseInt(response.headers.get('Retry-After'), 10) || 1;
+                console.log(`API Pending: ${endpoint}, polling ${data.poll} in ${retryAfter}s`);
+                await new Promise(resolve => setTimeout(resolve, retryAfter * 1000));
+                return await this.fetchAPI(data.poll);
+            }
+
             console.log(`API Response: ${endpoint}`, data);
             return data;
             
@@ -4,93 +4,239 @@ Healthcare API Integration Backend
 Flask application for healthcare interoperability dashboard
 """
 
-from flask import Flask, jsonify, request, render_template
+from flask import Flask, jsonify, request, render_template, url_for
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
+import hashlib
+import itertools
 import json
 import logging
+import math
+import multiprocessing
 import os
+import threading
 import time
-import random
 from typing import Dict, List, Any
 
+import numpy as np
+import orjson
+
 # Configure logging
+# Per-request logs are DEBUG; production defaults to WARNING so they cost nothing
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.getenv('LOG_LEVEL', 'WARNING').upper(),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
+# Shared random generator for simulated demo data
+rng = np.random.default_rng()
+
+# Simulated metrics are drawn from preallocated rings at startup; each request
+# just advances an index instead of calling the random generator
+JITTER_RING_SIZE = 1 << 16
+JITTER_RING_MASK = JITTER_RING_SIZE - 1
+
+
+def _int_ring(base: int, low: int, high: int) -> np.ndarray:
+    """Ring of base plus uniform integer jitter in [low, high]"""
+    return (base + rng.integers(low, high + 1, size=JITTER_RING_SIZE)).astype(np.int32)
+
+
+def _float_ring(base: float, spread: float) -> np.ndarray:
+    """Ring of base plus uniform jitter in [-spread, spread], rounded to one decimal"""
+    return np.round(base + rng.uniform(-spread, spread, size=JITTER_RING_SIZE), 1)
+
+
+# (epoch second, ISO string) of the last formatted timestamp; swapped as one tuple
+_iso_cache = (0, '')
+
+
+def _now_iso() -> str:
+    """Current local time in ISO format, formatted at most once per second"""
+    global _iso_cache
+    second = int(time.time())
+    cached_second, cached_iso = _iso_cache
+    if second != cached_second:
+        cached_iso = datetime.fromtimestamp(second).isoformat()
+        _iso_cache = (second, cached_iso)
+    return cached_iso
+
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson for faster (de)serialization"""
+    
+    option = orjson.OPT_NON_STR_KEYS
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, option=self.option).decode('utf-8')
+    
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+    
+    def response(self, *args: Any, **kwargs: Any):
+        # Hand orjson's bytes straight to the response, skipping the str round-trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=self.option),
+            mimetype='application/json'
+        )
+
+
 app = Flask(__name__, 
            template_folder='../client/templates',
            static_folder='../client/static')
+app.json = ORJSONProvider(app)  # Route every jsonify() through orjson
 CORS(app)  # Enable CORS for frontend integration
 
+# Valid FHIR R4 administrative gender codes
+FHIR_GENDERS = frozenset({'male', 'female', 'other', 'unknown'})
+
+
+def _validate_patient(resource: Dict[str, Any], errors: List[str], checks: List[str]) -> None:
+    """Patient-specific FHIR R4 validation rules"""
+    identifier = resource.get('identifier')
+    name = resource.get('name')
+    gender = resource.get('gender')
+    
+    if not identifier:
+        errors.append("Patient resource missing identifier")
+    else:
+        checks.append("Patient identifier present")
+    
+    if not name:
+        errors.append("Patient resource missing name")
+    else:
+        checks.append("Patient name present")
+    
+    if gender:
+        if isinstance(gender, str) and gender in FHIR_GENDERS:
+            checks.append("Valid gender value")
+        else:
+            errors.append("Invalid gender value")
+
+
+# resourceType -> validator(resource, errors, checks); add new resource types here
+FHIR_RESOURCE_VALIDATORS = {
+    'Patient': _validate_patient
+}
+
+
 # Healthcare API service classes
 class FHIRService:
     """FHIR R4 service for patient resource management"""
     
+    __slots__ = (
+        'base_url', '_ring_index', '_ring_active_patients', '_ring_requests_per_minute',
+        '_ring_uptime_percentage', '_ring_response_time_ms'
+    )
+    
     def __init__(self):
         self.base_url = "https://fhir.epic.com/interconnect-fhir-oauth"
+        self._ring_index = itertools.count()
+        self._ring_active_patients = _int_ring(2847, 0, 100)
+        self._ring_requests_per_minute = _int_ring(156, -20, 20)
+        self._ring_uptime_percentage = _float_ring(99.8, 0.2)
+        self._ring_response_time_ms = _int_ring(145, -30, 30)
         logger.info("FHIR Service initialized")
     
     def validate_patient_resource(self, resource: Dict[str, Any]) -> Dict[str, Any]:
         """Validate FHIR R4 Patient resource"""
-        logger.info(f"Validating FHIR resource: {resource.get('resourceType', 'Unknown')}")
+        logger.debug("Validating FHIR resource: %s", resource.get('resourceType', 'Unknown'))
         
         errors = []
         checks = []
         
         # Required field validation
-        if not resource.get('resourceType'):
+        resource_type = resource.get('resourceType')
+        if not resource_type:
             errors.append("Missing required field: resourceType")
         else:
-            checks.append(f"ResourceType '{resource['resourceType']}' present")
+            checks.append(f"ResourceType '{resource_type}' present")
         
-        # Patient-specific validation
-        if resource.get('resourceType') == 'Patient':
-            if not resource.get('identifier') or len(resource['identifier']) == 0:
-                errors.append("Patient resource missing identifier")
-            else:
-                checks.append("Patient identifier present")
-            
-            if not resource.get('name') or len(resource['name']) == 0:
-                errors.append("Patient resource missing name")
-            else:
-                checks.append("Patient name present")
-            
-            gender = resource.get('gender')
-            if gender and gender not in ['male', 'female', 'other', 'unknown']:
-                errors.append("Invalid gender value")
-            elif gender:
-                checks.append("Valid gender value")
+        # Resource-specific validation
+        validator = FHIR_RESOURCE_VALIDATORS.get(resource_type) if isinstance(resource_type, str) else None
+        if validator:
+            validator(resource, errors, checks)
         
         is_valid = len(errors) == 0
-        logger.info(f"FHIR validation result: {'VALID' if is_valid else 'INVALID'}")
+        logger.debug("FHIR validation result: %s", 'VALID' if is_valid else 'INVALID')
         
         return {
             'is_valid': is_valid,
             'errors': errors,
             'checks': checks,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': _now_iso()
         }
     
     def get_patient_metrics(self) -> Dict[str, Any]:
         """Get current patient metrics"""
+        i = next(self._ring_index) & JITTER_RING_MASK
         metrics = {
-            'active_patients': 2847 + random.randint(0, 100),
-            'requests_per_minute': 156 + random.randint(-20, 20),
-            'uptime_percentage': round(99.8 + random.uniform(-0.2, 0.2), 1),
-            'response_time_ms': 145 + random.randint(-30, 30)
+            'active_patients': int(self._ring_active_patients[i]),
+            'requests_per_minute': int(self._ring_requests_per_minute[i]),
+            'uptime_percentage': float(self._ring_uptime_percentage[i]),
+            'response_time_ms': int(self._ring_response_time_ms[i])
         }
         
-        logger.info(f"Generated FHIR patient metrics: {metrics}")
+        logger.debug("Generated FHIR patient metrics: %s", metrics)
         return metrics
 
 
+# HL7 administrative sex (PID-8) -> FHIR gender, keyed by both cases to avoid .upper()
+HL7_GENDER_TO_FHIR = {
+    'M': 'male', 'm': 'male',
+    'F': 'female', 'f': 'female',
+    'O': 'other', 'o': 'other',
+    'U': 'unknown', 'u': 'unknown'
+}
+
+
+@lru_cache(maxsize=4096)
+def _format_hl7_yyyymmdd(hl7_date: str) -> str:
+    """Convert an 8-character HL7 date (YYYYMMDD) to FHIR format (YYYY-MM-DD)"""
+    return hl7_date[:4] + '-' + hl7_date[4:6] + '-' + hl7_date[6:8]
+
+
+# Shared skeleton of the FHIR Patient produced from HL7; per-patient fields are
+# filled in after cloning. Key order matches the emitted resource.
+FHIR_PATIENT_TEMPLATE = orjson.dumps({
+    'resourceType': 'Patient',
+    'id': None,
+    'identifier': [{
+        'use': 'usual',
+        'type': {
+            'coding': [{
+                'system': 'http://terminology.hl7.org/CodeSystem/v2-0203',
+                'code': 'MR',
+                'display': 'Medical Record Number'
+            }]
+        },
+        'value': None
+    }],
+    'active': True,
+    'name': [{
+        'use': 'official',
+        'text': None,
+        'family': None,
+        'given': None
+    }],
+    'gender': None,
+    'birthDate': None
+})
+
+
 class HL7Service:
     """HL7 v2.x message processing service"""
     
+    __slots__ = (
+        'message_types', '_segment_handlers', '_ring_index',
+        '_ring_daily_message_count', '_ring_avg_processing_time', '_ring_queue_depth'
+    )
+    
     def __init__(self):
         self.message_types = {
             'ADT^A01': 'Admit Patient',
@@ -99,14 +245,27 @@ class HL7Service:
             'ORU^R01': 'Observation Result',
             'DFT^P03': 'Post Detail Financial Transaction'
         }
+        # Segment tag -> handler; one hash lookup per segment instead of an if/elif chain
+        self._segment_handlers = {
+            b'MSH': self._handle_msh,
+            b'PID': self._handle_pid,
+            b'PV1': self._handle_pv1,
+            b'EVN': self._handle_evn
+        }
+        self._ring_index = itertools.count()
+        self._ring_daily_message_count = _int_ring(1234, 0, 200)
+        self._ring_avg_processing_time = _float_ring(2.3, 0.5)
+        self._ring_queue_depth = _int_ring(0, 10, 100)
         logger.info("HL7 Service initialized")
     
     def parse_hl7_message(self, hl7_message: str) -> Dict[str, Any]:
         """Parse HL7 v2.x message and extract key information"""
-        logger.info("Parsing HL7 message")
+        logger.debug("Parsing HL7 message")
         
         try:
-            segments = hl7_message.strip().split('\n')
+            # Work on the encoded buffer: splitlines() is a single C pass, and only
+            # the fields that end up in parsed_data are decoded back to str
+            segments = hl7_message.encode('utf-8').strip().splitlines()
             parsed_data = {
                 'message_type': 'Unknown',
                 'control_id': 'Unknown',
@@ -116,110 +275,119 @@ class HL7Service:
             }
             
             for segment in segments:
-                fields = segment.split('|')
-                segment_type = fields[0] if fields else ''
+                # Only the segment tag is needed to classify a segment
+                separator = segment.find(b'|')
+                segment_type = segment[:separator] if separator >= 0 else segment
                 
-                if segment_type == 'MSH':
-                    parsed_data['message_type'] = fields[8] if len(fields) > 8 else 'Unknown'
-                    parsed_data['control_id'] = fields[9] if len(fields) > 9 else 'Unknown'
-                    parsed_data['processing_id'] = fields[10] if len(fields) > 10 else 'Unknown'
-                    parsed_data['segments']['MSH'] = 'Message Header'
-                    
-                elif segment_type == 'PID':
-                    parsed_data['patient_info'] = {
-                        'patient_id': fields[3].split('^')[0] if len(fields) > 3 else '',
-                        'patient_name': fields[5].replace('^', ' ') if len(fields) > 5 else '',
-                        'date_of_birth': fields[7] if len(fields) > 7 else '',
-                        'gender': fields[8] if len(fields) > 8 else ''
-                    }
-                    parsed_data['segments']['PID'] = 'Patient Identification'
-                    
-                elif segment_type == 'PV1':
-                    parsed_data['segments']['PV1'] = 'Patient Visit'
-                elif segment_type == 'EVN':
-                    parsed_data['segments']['EVN'] = 'Event Type'
+                handler = self._segment_handlers.get(segment_type)
+                if handler:
+                    handler(segment, parsed_data)
             
-            logger.info(f"Successfully parsed HL7 message type: {parsed_data['message_type']}")
+            logger.debug("Successfully parsed HL7 message type: %s", parsed_data['message_type'])
             return parsed_data
             
         except Exception as e:
-            logger.error(f"Error parsing HL7 message: {str(e)}")
+            logger.error("Error parsing HL7 message: %s", e)
             raise ValueError(f"Invalid HL7 message format: {str(e)}")
     
+    def _handle_msh(self, segment: bytes, parsed_data: Dict[str, Any]) -> None:
+        """Extract message type, control ID and processing ID from MSH"""
+        # MSH-9..MSH-11 are the last fields consumed; leave the tail unsplit
+        fields = segment.split(b'|', 11)
+        parsed_data['message_type'] = fields[8].decode('utf-8') if len(fields) > 8 else 'Unknown'
+        parsed_data['control_id'] = fields[9].decode('utf-8') if len(fields) > 9 else 'Unknown'
+        parsed_data['processing_id'] = fields[10].decode('utf-8') if len(fields) > 10 else 'Unknown'
+        parsed_data['segments']['MSH'] = 'Message Header'
+    
+    def _handle_pid(self, segment: bytes, parsed_data: Dict[str, Any]) -> None:
+        """Extract patient demographics from PID"""
+        # PID-8 (gender) is the last field consumed
+        fields = segment.split(b'|', 9)
+        parsed_data['patient_info'] = {
+            'patient_id': fields[3].split(b'^', 1)[0].decode('utf-8') if len(fields) > 3 else '',
+            'patient_name': fields[5].replace(b'^', b' ').decode('utf-8') if len(fields) > 5 else '',
+            'date_of_birth': fields[7].decode('utf-8') if len(fields) > 7 else '',
+            'gender': fields[8].decode('utf-8') if len(fields) > 8 else ''
+        }
+        parsed_data['segments']['PID'] = 'Patient Identification'
+    
+    def _handle_pv1(self, segment: bytes, parsed_data: Dict[str, Any]) -> None:
+        """Record the PV1 segment"""
+        parsed_data['segments']['PV1'] = 'Patient Visit'
+    
+    def _handle_evn(self, segment: bytes, parsed_data: Dict[str, Any]) -> None:
+        """Record the EVN segment"""
+        parsed_data['segments']['EVN'] = 'Event Type'
+    
     def transform_hl7_to_fhir(self, hl7_message: str) -> Dict[str, Any]:
         """Transform HL7 v2.x message to FHIR Patient resource"""
-        logger.info("Transforming HL7 to FHIR")
+        logger.debug("Transforming HL7 to FHIR")
         
         parsed = self.parse_hl7_message(hl7_message)
         patient_info = parsed.get('patient_info', {})
         
-        fhir_patient = {
-            'resourceType': 'Patient',
-            'id': patient_info.get('patient_id', 'unknown'),
-            'identifier': [{
-                'use': 'usual',
-                'type': {
-                    'coding': [{
-                        'system': 'http://terminology.hl7.org/CodeSystem/v2-0203',
-                        'code': 'MR',
-                        'display': 'Medical Record Number'
-                    }]
-                },
-                'value': patient_info.get('patient_id', '')
-            }],
-            'active': True,
-            'name': [{
-                'use': 'official',
-                'text': patient_info.get('patient_name', ''),
-                'family': patient_info.get('patient_name', '').split(' ')[0] if patient_info.get('patient_name') else '',
-                'given': patient_info.get('patient_name', '').split(' ')[1:] if patient_info.get('patient_name') else []
-            }],
-            'gender': self._map_hl7_gender_to_fhir(patient_info.get('gender', '')),
-            'birthDate': self._format_hl7_date(patient_info.get('date_of_birth', ''))
-        }
+        # orjson round-trip is a cheap deep clone of the pure-JSON skeleton
+        fhir_patient = orjson.loads(FHIR_PATIENT_TEMPLATE)
+        fhir_patient['id'] = patient_info.get('patient_id', 'unknown')
+        fhir_patient['identifier'][0]['value'] = patient_info.get('patient_id', '')
+        patient_name = patient_info.get('patient_name', '')
+        name_parts = patient_name.split(' ') if patient_name else []
+        name = fhir_patient['name'][0]
+        name['text'] = patient_name
+        name['family'] = name_parts[0] if name_parts else ''
+        name['given'] = name_parts[1:]
+        fhir_patient['gender'] = self._map_hl7_gender_to_fhir(patient_info.get('gender', ''))
+        fhir_patient['birthDate'] = self._format_hl7_date(patient_info.get('date_of_birth', ''))
         
-        logger.info(f"Successfully transformed HL7 to FHIR Patient: {fhir_patient['id']}")
+        logger.debug("Successfully transformed HL7 to FHIR Patient: %s", fhir_patient['id'])
         return fhir_patient
     
     def _map_hl7_gender_to_fhir(self, hl7_gender: str) -> str:
         """Map HL7 gender codes to FHIR gender values"""
-        mapping = {'M': 'male', 'F': 'female', 'O': 'other', 'U': 'unknown'}
-        return mapping.get(hl7_gender.upper(), 'unknown')
+        return HL7_GENDER_TO_FHIR.get(hl7_gender, 'unknown')
     
     def _format_hl7_date(self, hl7_date: str) -> str:
         """Convert HL7 date format (YYYYMMDD) to FHIR date format (YYYY-MM-DD)"""
         if hl7_date and len(hl7_date) >= 8:
-            return f"{hl7_date[:4]}-{hl7_date[4:6]}-{hl7_date[6:8]}"
+            # Only the date part is cached, so cache keys stay 8 characters long
+            return _format_hl7_yyyymmdd(hl7_date[:8])
         return None
     
     def get_message_metrics(self) -> Dict[str, Any]:
         """Get current HL7 message processing metrics"""
+        i = next(self._ring_index) & JITTER_RING_MASK
         metrics = {
-            'daily_message_count': 1234 + random.randint(0, 200),
-            'avg_processing_time': round(2.3 + random.uniform(-0.5, 0.5), 1),
+            'daily_message_count': int(self._ring_daily_message_count[i]),
+            'avg_processing_time': float(self._ring_avg_processing_time[i]),
             'most_common_type': 'ADT^A01',
-            'queue_depth': random.randint(10, 100)
+            'queue_depth': int(self._ring_queue_depth[i])
         }
         
-        logger.info(f"Generated HL7 metrics: {metrics}")
+        logger.debug("Generated HL7 metrics: %s", metrics)
         return metrics
 
 
 class EpicService:
     """Epic Interconnect integration service"""
     
+    __slots__ = (
+        'base_url', 'client_id', '_ring_index',
+        '_ring_response_time_ms', '_ring_api_calls_per_second'
+    )
+    
     def __init__(self):
         self.base_url = "https://fhir.epic.com/interconnect-fhir-oauth"
         self.client_id = os.getenv('EPIC_CLIENT_ID', 'demo-client-id')
+        self._ring_index = itertools.count()
+        self._ring_response_time_ms = _int_ring(145, -25, 25)
+        self._ring_api_calls_per_second = _int_ring(156, -20, 20)
         logger.info("Epic Service initialized")
     
     def test_connection(self) -> Dict[str, Any]:
         """Test Epic MyChart connection"""
-        logger.info("Testing Epic connection")
-        
-        # Simulate connection test
-        time.sleep(1)  # Simulate network delay
+        logger.debug("Testing Epic connection")
         
+        # Network delay is simulated by the polling protocol in the API routes
         test_results = {
             'oauth_auth': {'status': 'success', 'response_time': 145},
             'patient_api': {'status': 'success', 'response_time': 167},
@@ -228,36 +396,39 @@ class EpicService:
             'overall_status': 'operational'
         }
         
-        logger.info(f"Epic connection test results: {test_results['overall_status']}")
+        logger.debug("Epic connection test results: %s", test_results['overall_status'])
         return test_results
     
     def get_epic_metrics(self) -> Dict[str, Any]:
         """Get Epic integration metrics"""
+        i = next(self._ring_index) & JITTER_RING_MASK
         metrics = {
             'provider_organizations': 847,
             'patient_records': '23.4M',
-            'response_time_ms': 145 + random.randint(-25, 25),
-            'api_calls_per_second': 156 + random.randint(-20, 20)
+            'response_time_ms': int(self._ring_response_time_ms[i]),
+            'api_calls_per_second': int(self._ring_api_calls_per_second[i])
         }
         
-        logger.info(f"Generated Epic metrics: {metrics}")
+        logger.debug("Generated Epic metrics: %s", metrics)
         return metrics
 
 
 class CernerService:
     """Cerner PowerChart integration service"""
     
+    __slots__ = ('base_url', '_ring_index', '_ring_average_response_time')
+    
     def __init__(self):
         self.base_url = "https://fhir-open.cerner.com"
+        self._ring_index = itertools.count()
+        self._ring_average_response_time = _int_ring(189, -30, 30)
         logger.info("Cerner Service initialized")
     
     def test_connection(self) -> Dict[str, Any]:
         """Test Cerner PowerChart connection"""
-        logger.info("Testing Cerner connection")
-        
-        # Simulate connection test
-        time.sleep(1)  # Simulate network delay
+        logger.debug("Testing Cerner connection")
         
+        # Network delay is simulated by the polling protocol in the API routes
         test_results = {
             'smart_on_fhir': {'status': 'connected', 'response_time': 189},
             'medication_orders': {'status': 'active', 'response_time': 156},
@@ -266,39 +437,51 @@ class CernerService:
             'overall_status': 'operational_with_delays'
         }
         
-        logger.info(f"Cerner connection test results: {test_results['overall_status']}")
+        logger.debug("Cerner connection test results: %s", test_results['overall_status'])
         return test_results
     
     def get_cerner_metrics(self) -> Dict[str, Any]:
         """Get Cerner integration metrics"""
+        i = next(self._ring_index) & JITTER_RING_MASK
         metrics = {
             'connected_facilities': 234,
             'medication_orders_today': 1567,
             'lab_results_processed': 892,
-            'average_response_time': 189 + random.randint(-30, 30)
+            'average_response_time': int(self._ring_average_response_time[i])
         }
         
-        logger.info(f"Generated Cerner metrics: {metrics}")
+        logger.debug("Generated Cerner metrics: %s", metrics)
         return metrics
 
 
 class AzureHealthService:
     """Azure Health Data Services integration"""
     
+    __slots__ = (
+        'workspace_url', '_ring_index', '_ring_sla_compliance',
+        '_ring_data_processed_tb', '_ring_api_calls_per_second', '_ring_storage_used_gb'
+    )
+    
     def __init__(self):
         self.workspace_url = "https://yourworkspace-yourfhirservice.fhir.azurehealthcareapis.com"
+        self._ring_index = itertools.count()
+        self._ring_sla_compliance = _float_ring(99.8, 0.2)
+        self._ring_data_processed_tb = _float_ring(2.1, 0.3)
+        self._ring_api_calls_per_second = _int_ring(156, -30, 30)
+        self._ring_storage_used_gb = _int_ring(15678, -1000, 1000)
         logger.info("Azure Health Service initialized")
     
     def get_azure_metrics(self) -> Dict[str, Any]:
         """Get Azure Health Data Services metrics"""
+        i = next(self._ring_index) & JITTER_RING_MASK
         metrics = {
-            'sla_compliance': round(99.8 + random.uniform(-0.2, 0.2), 1),
-            'data_processed_tb': round(2.1 + random.uniform(-0.3, 0.3), 1),
-            'api_calls_per_second': 156 + random.randint(-30, 30),
-            'storage_used_gb': 15678 + random.randint(-1000, 1000)
+            'sla_compliance': float(self._ring_sla_compliance[i]),
+            'data_processed_tb': float(self._ring_data_processed_tb[i]),
+            'api_calls_per_second': int(self._ring_api_calls_per_second[i]),
+            'storage_used_gb': int(self._ring_storage_used_gb[i])
         }
         
-        logger.info(f"Generated Azure Health metrics: {metrics}")
+        logger.debug("Generated Azure Health metrics: %s", metrics)
         return metrics
 
 
@@ -310,29 +493,70 @@ cerner_service = CernerService()
 azure_service = AzureHealthService()
 
 
+# Precompiled response bodies for fixed-shape endpoints: the JSON skeleton is
+# serialized once and only the per-request values are spliced in
+JSON_SLOT = '__slot__'
+_JSON_SLOT_BYTES = orjson.dumps(JSON_SLOT)
+
+
+def compile_json_template(obj: Any) -> List[bytes]:
+    """Serialize obj once and split it at each JSON_SLOT placeholder"""
+    return orjson.dumps(obj).split(_JSON_SLOT_BYTES)
+
+
+def render_json_template(parts: List[bytes], *values: Any):
+    """Splice serialized values into a compiled template as a JSON response"""
+    chunks = [parts[0]]
+    # strict: a value/slot count mismatch must fail loudly, not emit broken JSON
+    for value, part in zip(values, parts[1:], strict=True):
+        chunks.append(orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY))
+        chunks.append(part)
+    return app.response_class(b''.join(chunks), mimetype='application/json')
+
+
+# Rendered dashboard page and its ETag. The template has no per-request context,
+# so it is rendered on the first request (url_for needs a request context).
+_index_page = None
+
+
 # API Routes
 @app.route('/')
 def index():
     """Serve the main dashboard"""
-    logger.info("Serving main dashboard")
-    return render_template('index.html')
+    global _index_page
+    logger.debug("Serving main dashboard")
+    
+    # Re-render every time in debug mode so template edits still show up
+    if _index_page is None or app.debug:
+        html = render_template('index.html').encode('utf-8')
+        _index_page = (html, hashlib.blake2b(html, digest_size=16).hexdigest())
+    html, etag = _index_page
+    
+    response = app.response_class(html, mimetype='text/html')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 60
+    return response.make_conditional(request)
+
+
+# Health payload is fixed apart from the timestamp
+HEALTH_TEMPLATE = compile_json_template({
+    'status': 'healthy',
+    'timestamp': JSON_SLOT,
+    'services': {
+        'fhir': 'operational',
+        'hl7': 'operational',
+        'epic': 'operational',
+        'cerner': 'operational',
+        'azure': 'operational'
+    }
+})
 
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    logger.info("Health check requested")
-    return jsonify({
-        'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
-        'services': {
-            'fhir': 'operational',
-            'hl7': 'operational',
-            'epic': 'operational',
-            'cerner': 'operational',
-            'azure': 'operational'
-        }
-    })
+    return render_json_template(HEALTH_TEMPLATE, _now_iso())
 
 
 @app.route('/api/fhir/validate', methods=['POST'])
@@ -340,20 +564,20 @@ def validate_fhir():
     """Validate FHIR resource"""
     try:
         resource = request.json
-        logger.info(f"FHIR validation requested for resource type: {resource.get('resourceType', 'Unknown')}")
+        logger.debug("FHIR validation requested for resource type: %s", resource.get('resourceType', 'Unknown'))
         
         validation_result = fhir_service.validate_patient_resource(resource)
         return jsonify(validation_result)
         
     except Exception as e:
-        logger.error(f"FHIR validation error: {str(e)}")
+        logger.error("FHIR validation error: %s", e)
         return jsonify({'error': str(e)}), 400
 
 
 @app.route('/api/fhir/metrics', methods=['GET'])
 def get_fhir_metrics():
     """Get FHIR service metrics"""
-    logger.info("FHIR metrics requested")
+    logger.debug("FHIR metrics requested")
     metrics = fhir_service.get_patient_metrics()
     return jsonify(metrics)
 
@@ -363,13 +587,73 @@ def parse_hl7():
     """Parse HL7 message"""
     try:
         hl7_message = request.json.get('message', '')
-        logger.info("HL7 parsing requested")
+        logger.debug("HL7 parsing requested")
         
         parsed_result = hl7_service.parse_hl7_message(hl7_message)
         return jsonify(parsed_result)
         
     except Exception as e:
-        logger.error(f"HL7 parsing error: {str(e)}")
+        logger.error("HL7 parsing error: %s", e)
+        return jsonify({'error': str(e)}), 400
+
+
+# Large HL7 batches fan out over a per-worker process pool, created on first use.
+# Children are spawned rather than forked so they never inherit locks held by
+# other request threads. Every gunicorn worker owns a pool, so by default the
+# cores are shared out across WEB_CONCURRENCY workers; HL7_BATCH_WORKERS overrides.
+HL7_BATCH_WORKERS = int(os.getenv(
+    'HL7_BATCH_WORKERS',
+    max(1, (os.cpu_count() or 1) // int(os.getenv('WEB_CONCURRENCY', '1')))
+))
+# A message parses in a few microseconds, so shipping work to the pool only pays
+# off once the batch outweighs the pickling and dispatch overhead (~0.3 ms per map)
+HL7_BATCH_INLINE_LIMIT = 1000
+_hl7_executor = None
+_hl7_executor_lock = threading.Lock()
+
+
+def _get_hl7_executor() -> ProcessPoolExecutor:
+    """Return the process pool used for batch HL7 parsing"""
+    global _hl7_executor
+    with _hl7_executor_lock:
+        if _hl7_executor is None:
+            _hl7_executor = ProcessPoolExecutor(
+                max_workers=HL7_BATCH_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+    return _hl7_executor
+
+
+def _parse_hl7_batch_item(hl7_message: str) -> Dict[str, Any]:
+    """Parse one message of a batch, reporting failures inline"""
+    try:
+        return hl7_service.parse_hl7_message(hl7_message)
+    except ValueError as e:
+        return {'error': str(e)}
+
+
+@app.route('/api/hl7/parse-batch', methods=['POST'])
+def parse_hl7_batch():
+    """Parse a batch of HL7 messages"""
+    try:
+        messages = request.json.get('messages', [])
+        if not isinstance(messages, list):
+            raise ValueError("'messages' must be a list of HL7 messages")
+        logger.debug("HL7 batch parsing requested: %d messages", len(messages))
+        
+        # Small batches (or a single-process pool) are cheaper to parse inline
+        if HL7_BATCH_WORKERS <= 1 or len(messages) <= HL7_BATCH_INLINE_LIMIT:
+            results = [_parse_hl7_batch_item(message) for message in messages]
+        else:
+            # One chunk per pool process keeps the per-chunk dispatch cost fixed
+            chunksize = math.ceil(len(messages) / HL7_BATCH_WORKERS)
+            results = list(_get_hl7_executor().map(
+                _parse_hl7_batch_item, messages, chunksize=chunksize
+            ))
+        return jsonify({'count': len(results), 'results': results})
+        
+    except Exception as e:
+        logger.error("HL7 batch parsing error: %s", e)
         return jsonify({'error': str(e)}), 400
 
 
@@ -378,28 +662,65 @@ def transform_hl7_to_fhir():
     """Transform HL7 to FHIR"""
     try:
         hl7_message = request.json.get('message', '')
-        logger.info("HL7 to FHIR transformation requested")
+        logger.debug("HL7 to FHIR transformation requested")
         
         fhir_resource = hl7_service.transform_hl7_to_fhir(hl7_message)
         return jsonify(fhir_resource)
         
     except Exception as e:
-        logger.error(f"HL7 to FHIR transformation error: {str(e)}")
+        logger.error("HL7 to FHIR transformation error: %s", e)
         return jsonify({'error': str(e)}), 400
 
 
 @app.route('/api/hl7/metrics', methods=['GET'])
 def get_hl7_metrics():
     """Get HL7 service metrics"""
-    logger.info("HL7 metrics requested")
+    logger.debug("HL7 metrics requested")
     metrics = hl7_service.get_message_metrics()
     return jsonify(metrics)
 
 
+# Connection tests simulate network latency without holding a worker: the test
+# route answers 202 with Retry-After and a poll URL that serves the results once
+# the delay has passed. The poll token is the ready time itself, so any gunicorn
+# worker process can answer it.
+CONNECTION_TEST_DELAY_MS = 1000
+
+
+def _now_ms() -> int:
+    """Current wall-clock time in milliseconds"""
+    return int(time.time() * 1000)
+
+
+def _connection_test_ready_at() -> int:
+    """Time (ms) at which a connection test started now becomes ready"""
+    return _now_ms() + CONNECTION_TEST_DELAY_MS
+
+
+def _connection_test_pending(poll_endpoint: str, ready_at: int):
+    """202 response pointing the client at the poll URL for a pending test"""
+    response = jsonify({
+        'status': 'pending',
+        'poll': url_for(poll_endpoint, ready_at=ready_at)
+    })
+    response.status_code = 202
+    retry_after = max(1, math.ceil((ready_at - _now_ms()) / 1000))
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
 @app.route('/api/epic/test', methods=['POST'])
 def test_epic_connection():
-    """Test Epic connection"""
-    logger.info("Epic connection test requested")
+    """Start an Epic connection test"""
+    logger.debug("Epic connection test requested")
+    return _connection_test_pending('get_epic_test_results', _connection_test_ready_at())
+
+
+@app.route('/api/epic/test/<int:ready_at>', methods=['GET'])
+def get_epic_test_results(ready_at):
+    """Get Epic connection test results once the simulated delay has passed"""
+    if _now_ms() < ready_at:
+        return _connection_test_pending('get_epic_test_results', ready_at)
     test_results = epic_service.test_connection()
     return jsonify(test_results)
 
@@ -407,15 +728,23 @@ def test_epic_connection():
 @app.route('/api/epic/metrics', methods=['GET'])
 def get_epic_metrics():
     """Get Epic integration metrics"""
-    logger.info("Epic metrics requested")
+    logger.debug("Epic metrics requested")
     metrics = epic_service.get_epic_metrics()
     return jsonify(metrics)
 
 
 @app.route('/api/cerner/test', methods=['POST'])
 def test_cerner_connection():
-    """Test Cerner connection"""
-    logger.info("Cerner connection test requested")
+    """Start a Cerner connection test"""
+    logger.debug("Cerner connection test requested")
+    return _connection_test_pending('get_cerner_test_results', _connection_test_ready_at())
+
+
+@app.route('/api/cerner/test/<int:ready_at>', methods=['GET'])
+def get_cerner_test_results(ready_at):
+    """Get Cerner connection test results once the simulated delay has passed"""
+    if _now_ms() < ready_at:
+        return _connection_test_pending('get_cerner_test_results', ready_at)
     test_results = cerner_service.test_connection()
     return jsonify(test_results)
 
@@ -423,7 +752,7 @@ def test_cerner_connection():
 @app.route('/api/cerner/metrics', methods=['GET'])
 def get_cerner_metrics():
     """Get Cerner integration metrics"""
-    logger.info("Cerner metrics requested")
+    logger.debug("Cerner metrics requested")
     metrics = cerner_service.get_cerner_metrics()
     return jsonify(metrics)
 
@@ -431,51 +760,60 @@ def get_cerner_metrics():
 @app.route('/api/azure/metrics', methods=['GET'])
 def get_azure_metrics():
     """Get Azure Health Data Services metrics"""
-    logger.info("Azure Health metrics requested")
+    logger.debug("Azure Health metrics requested")
     metrics = azure_service.get_azure_metrics()
     return jsonify(metrics)
 
 
+# Response-time series: rows are FHIR / HL7 / Epic baselines and jitter spreads
+RESPONSE_TIME_LABELS = ['00:00', '04:00', '08:00', '12:00', '16:00', '20:00', '24:00']
+RESPONSE_TIME_BASELINES = np.array([145, 230, 167])[:, None]
+RESPONSE_TIME_SPREADS = np.array([20, 30, 25])[:, None]
+RESPONSE_TIMES_TEMPLATE = compile_json_template({
+    'labels': RESPONSE_TIME_LABELS,
+    'datasets': [
+        {
+            'label': 'FHIR API',
+            'data': JSON_SLOT,
+            'borderColor': '#059669'
+        },
+        {
+            'label': 'HL7 Processing',
+            'data': JSON_SLOT,
+            'borderColor': '#e67e22'
+        },
+        {
+            'label': 'Epic Bridge',
+            'data': JSON_SLOT,
+            'borderColor': '#6b46c1'
+        }
+    ]
+})
+
+
 @app.route('/api/analytics/response-times', methods=['GET'])
 def get_response_times():
     """Get API response time analytics"""
-    logger.info("Response time analytics requested")
-    
-    # Generate realistic response time data
-    time_labels = ['00:00', '04:00', '08:00', '12:00', '16:00', '20:00', '24:00']
-    
-    response_data = {
-        'labels': time_labels,
-        'datasets': [
-            {
-                'label': 'FHIR API',
-                'data': [145 + random.randint(-20, 20) for _ in time_labels],
-                'borderColor': '#059669'
-            },
-            {
-                'label': 'HL7 Processing',
-                'data': [230 + random.randint(-30, 30) for _ in time_labels],
-                'borderColor': '#e67e22'
-            },
-            {
-                'label': 'Epic Bridge',
-                'data': [167 + random.randint(-25, 25) for _ in time_labels],
-                'borderColor': '#6b46c1'
-            }
-        ]
-    }
+    logger.debug("Response time analytics requested")
     
-    return jsonify(response_data)
+    # Generate realistic response time data in one vectorized draw
+    data = rng.integers(
+        RESPONSE_TIME_BASELINES - RESPONSE_TIME_SPREADS,
+        RESPONSE_TIME_BASELINES + RESPONSE_TIME_SPREADS + 1,
+        size=(3, len(RESPONSE_TIME_LABELS))
+    )
+    
+    return render_json_template(RESPONSE_TIMES_TEMPLATE, *data)
 
 
 @app.route('/api/analytics/message-volume', methods=['GET'])
 def get_message_volume():
     """Get HL7 message volume analytics"""
-    logger.info("Message volume analytics requested")
+    logger.debug("Message volume analytics requested")
     
     volume_data = {
         'labels': ['ADT (Admit/Discharge)', 'ORM (Orders)', 'ORU (Results)', 'DFT (Financial)'],
-        'data': [45 + random.randint(-5, 5) for _ in range(4)],
+        'data': rng.integers(40, 51, size=4).tolist(),
         'backgroundColor': ['#0078d4', '#e67e22', '#6b46c1', '#059669']
     }
     
@@ -485,13 +823,11 @@ def get_message_volume():
 @app.route('/api/analytics/system-health', methods=['GET'])
 def get_system_health():
     """Get system health analytics"""
-    logger.info("System health analytics requested")
+    logger.debug("System health analytics requested")
     
     health_data = {
         'labels': ['Epic Bridge', 'Cerner API', 'FHIR Service', 'HL7 Engine', 'Azure Health'],
-        'data': [
-            round(99.8 + random.uniform(-0.2, 0.2), 1) for _ in range(5)
-        ],
+        'data': np.round(rng.uniform(99.6, 100.0, size=5), 1).tolist(),
         'backgroundColor': ['#6b46c1', '#e67e22', '#059669', '#f59e0b', '#0078d4']
     }
     
@@ -499,6 +835,13 @@ def get_system_health():
 
 
 if __name__ == '__main__':
+    # The Werkzeug server is single-process with the debugger attached; production
+    # runs under gunicorn (see Procfile)
+    if not os.getenv('FLASK_DEV'):
+        logger.error("Development server disabled: set FLASK_DEV=1, or run "
+                     "'WEB_CONCURRENCY=4 gunicorn -k gthread --threads 16 -b 0.0.0.0:5000 server.app:app'")
+        raise SystemExit(1)
+    
     # Set environment variables for development
     os.environ.setdefault('FLASK_ENV', 'development')
     os.environ.setdefault('FLASK_DEBUG', 'True')